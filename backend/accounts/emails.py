@@ -1,8 +1,44 @@
-from django.core.mail import send_mail
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# SMTP delivery runs here so RegisterView can respond without waiting on it
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# One SMTP connection per worker thread, kept open across sends
+_local = threading.local()
+
+def _connection():
+    conn = getattr(_local, 'connection', None)
+    if conn is None:
+        conn = _local.connection = get_connection(fail_silently=True)
+    return conn
+
+def _deliver(message: EmailMessage):
+    conn = _connection()
+    # Nothing waits on the Future, so failures must be logged here; open()
+    # only swallows OSError, anything else still raises
+    try:
+        # An idle connection may have been dropped by the server; reconnect once
+        for _ in range(2):
+            # open() returns None when it failed silently (e.g. rejected login)
+            if conn.open() is not None and conn.send_messages([message]):
+                return
+            conn.close()
+        logger.error("Verification email to %s was not sent", message.to)
+    except Exception:
+        logger.exception("Failed to send verification email to %s", message.to)
+        try:
+            conn.close()
+        except Exception:
+            _local.connection = None
+
 def send_verification_email(email: str, token: str):
     verify_url = f"{settings.HOST}/api/auth/verify-email/?token={token}"
     subject = "Verify your email"
     body = f"Click to verify: {verify_url}\nToken: {token}"
-    send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [email], fail_silently=True)
+    _EXECUTOR.submit(_deliver, EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [email]))
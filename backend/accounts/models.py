@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-import uuid
+from django.db.models import Q
+from django.contrib.postgres.functions import RandomUUID
 from django.utils import timezone
 
 class User(AbstractUser):
@@ -24,6 +25,10 @@ class SocialAccount(models.Model):
 
 class EmailVerificationToken(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='email_tokens')
-    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    token = models.UUIDField(db_default=RandomUUID(), unique=True, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     is_used = models.BooleanField(default=False)
+    class Meta:
+        indexes = [
+            models.Index(fields=["token"], condition=Q(is_used=False), name="unused_token_idx"),
+        ]
@@ -1,22 +1,67 @@
+import httpx
 import requests
+from http.cookiejar import DefaultCookiePolicy
+from cachecontrol import CacheControl
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from google.oauth2 import id_token as google_id_token
+from google.auth.transport import requests as grequests
 from typing import Tuple, Dict
 
+# Shared HTTP/2 client: a single login makes several calls to the same host,
+# and the concurrent profile/email lookups multiplex over one connection
+_CLIENT = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+# The client is shared by every user, so its cookie jar must never store or
+# replay provider cookies from one user's calls on another's
+_NO_COOKIES = DefaultCookiePolicy(allowed_domains=[])
+_CLIENT.cookies.jar.set_policy(_NO_COOKIES)
+
+# Runs the email lookup while the request thread fetches the profile
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# google-auth's transport needs a requests Session; Google's signing certs carry
+# a long Cache-Control max-age, so serve them from a caching session
+_G_SESSION = requests.Session()
+_G_SESSION.cookies.set_policy(_NO_COOKIES)
+_G_REQUEST = grequests.Request(session=CacheControl(_G_SESSION))
+
 class ProviderError(Exception):
     pass
 
 class GoogleProvider:
     name = 'google'
 
+    @staticmethod
+    def exchange_code(code, code_verifier=None):
+        payload = {
+            'code': code, 
+            'client_id': settings.GOOGLE_CLIENT_ID, 
+            'client_secret': settings.GOOGLE_CLIENT_SECRET, 
+            'redirect_uri': settings.OAUTH_REDIRECT_URI, 
+            'grant_type': 'authorization_code',
+        }
+        if code_verifier: payload['code_verifier'] = code_verifier
+        r = _CLIENT.post(
+                'https://oauth2.googleapis.com/token', 
+                data = payload
+            )
+
+        r.raise_for_status(); tok = r.json(); id_token = tok.get('id_token')
+
+        # id_token already carries sub/email/name/picture; userinfo is only a fallback
+        return (None if id_token else tok.get('access_token')), id_token
+
     @staticmethod
     def fetch_user(access_token=None, id_token=None):
         if id_token:
-            from google.oauth2 import id_token as google_id_token
-            from google.auth.transport import requests as grequests
-
             info = google_id_token.verify_oauth2_token(
                 id_token, 
-                grequests.Request(), 
+                _G_REQUEST, 
                 settings.GOOGLE_CLIENT_ID
             )
 
@@ -27,7 +72,7 @@ class GoogleProvider:
             }
 
         if access_token:
-            r = requests.get(
+            r = _CLIENT.get(
                     'https://www.googleapis.com/oauth2/v3/userinfo', 
                     headers = {
                         'Authorization': f'Bearer { access_token }',
@@ -50,7 +95,7 @@ class GitHubProvider:
 
     @staticmethod
     def exchange_code(code, code_verifier=None):
-        r = requests.post(
+        r = _CLIENT.post(
                 'https://github.com/login/oauth/access_token', 
                 data = {
                     'client_id': settings.GITHUB_CLIENT_ID,
@@ -63,11 +108,20 @@ class GitHubProvider:
                 }
             )
 
-        r.raise_for_status(); return r.json().get('access_token')
+        r.raise_for_status(); return r.json().get('access_token'), None
 
     @staticmethod
-    def fetch_user(access_token):
-        u = requests.get(
+    def fetch_user(access_token=None, id_token=None):
+        # Email lookup overlaps the profile call below
+        e_future = _EXECUTOR.submit(
+                _CLIENT.get,
+                'https://api.github.com/user/emails', 
+                headers = {
+                    'Authorization': f'Bearer {access_token}',
+                }
+            )
+
+        u = _CLIENT.get(
                 'https://api.github.com/user', 
                 headers = {
                     'Authorization': f'Bearer {access_token}',
@@ -79,12 +133,7 @@ class GitHubProvider:
         email = ud.get('email')
 
         if not email:
-            e = requests.get(
-                    'https://api.github.com/user/emails', 
-                    headers = {
-                        'Authorization': f'Bearer {access_token}',
-                    }
-                )
+            e = e_future.result()
 
             if e.status_code==200:
                 emails = e.json(); primary = next((x['email'] for x in emails if x.get('primary')), None)
@@ -100,9 +149,23 @@ class FacebookProvider:
     name = 'facebook'
 
     @staticmethod
-    def fetch_user(access_token):
+    def exchange_code(code, code_verifier=None):
+        r = _CLIENT.get(
+                'https://graph.facebook.com/v17.0/oauth/access_token', 
+                params = {
+                    'client_id': settings.FACEBOOK_CLIENT_ID, 
+                    'client_secret': settings.FACEBOOK_CLIENT_SECRET, 
+                    'code': code, 
+                    'redirect_uri': settings.OAUTH_REDIRECT_URI,
+                }
+            )
+
+        r.raise_for_status(); return r.json().get('access_token'), None
+
+    @staticmethod
+    def fetch_user(access_token=None, id_token=None):
         fields = 'id,name,email'
-        r = requests.get(
+        r = _CLIENT.get(
                 f'https://graph.facebook.com/me?fields={fields}', 
                 headers = {
                     'Authorization': f'Bearer {access_token}',
@@ -119,37 +182,42 @@ class LinkedInProvider:
 
     @staticmethod
     def exchange_code(code, code_verifier=None):
-        r = requests.post(
+        payload = {
+            'grant_type': 'authorization_code',
+            'code': code,
+            'client_id': settings.LINKEDIN_CLIENT_ID,
+            'client_secret': settings.LINKEDIN_CLIENT_SECRET,
+            'redirect_uri': settings.OAUTH_REDIRECT_URI,
+        }
+        if code_verifier: payload['code_verifier'] = code_verifier
+        r = _CLIENT.post(
                 'https://www.linkedin.com/oauth/v2/accessToken', 
-                data = {
-                    'grant_type': 'authorization_code',
-                    'code': code,
-                    'client_id': settings.LINKEDIN_CLIENT_ID,
-                    'client_secret': settings.LINKEDIN_CLIENT_SECRET,
-                    'redirect_uri': settings.OAUTH_REDIRECT_URI,
-                }
+                data = payload
             )
 
-        r.raise_for_status(); return r.json().get('access_token')
+        r.raise_for_status(); return r.json().get('access_token'), None
 
     @staticmethod
-    def fetch_user(access_token):
-        u = requests.get(
-                'https://api.linkedin.com/v2/me', 
+    def fetch_user(access_token=None, id_token=None):
+        # Email lookup overlaps the profile call below
+        e_future = _EXECUTOR.submit(
+                _CLIENT.get,
+                'https://api.linkedin.com/v2/emailAddress?q=members&projection=(elements*(handle~))', 
                 headers = {
                     'Authorization': f'Bearer {access_token}',
                 }
             )
 
-        u.raise_for_status(); prof = u.json()
-
-        emailr = requests.get(
-                'https://api.linkedin.com/v2/emailAddress?q=members&projection=(elements*(handle~))', 
+        u = _CLIENT.get(
+                'https://api.linkedin.com/v2/me', 
                 headers = {
                     'Authorization': f'Bearer {access_token}',
                 }
             )
 
+        u.raise_for_status(); prof = u.json()
+
+        emailr = e_future.result()
         email = None
 
         if emailr.status_code==200:
@@ -168,3 +236,5 @@ PROVIDERS = {
     'facebook': FacebookProvider, 
     'linkedin': LinkedInProvider,
 }
+
+PROVIDER_NAMES = frozenset(PROVIDERS)
@@ -0,0 +1,27 @@
+import orjson
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+# orjson writes NaN/Infinity as null and leaves U+2028/U+2029 unescaped;
+# output containing these is re-rendered by JSONRenderer so STRICT_JSON and
+# its JavaScript-safe escaping still apply
+_FALLBACK_MARKERS = (b'null', '\u2028'.encode(), '\u2029'.encode())
+
+class ORJSONRenderer(JSONRenderer):
+    # Lazy translations, Decimals etc. fall back to DRF's own encoder
+    _default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # orjson only produces compact, non-ASCII-escaped output; indent=N,
+        # COMPACT_JSON=False and UNICODE_JSON=False go through JSONRenderer
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+        if any(marker in ret for marker in _FALLBACK_MARKERS):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret
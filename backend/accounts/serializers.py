@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
 from .models import User
+from .providers import PROVIDER_NAMES
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -19,8 +20,7 @@ class LoginSerializer(serializers.Serializer):
         email = attrs.get('email')
         password = attrs.get('password')
         try:
-            user = User.objects.get(email=email)
-            username = user.username
+            username = User.objects.values_list('username', flat=True).get(email=email)
         except User.DoesNotExist:
             raise serializers.ValidationError('Invalid credentials')
         user = authenticate(username=username, password=password)
@@ -30,8 +30,12 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 class SocialAuthSerializer(serializers.Serializer):
-    provider = serializers.ChoiceField(choices=["google","github","facebook","linkedin"])
+    provider = serializers.CharField()
     access_token = serializers.CharField(required=False, allow_blank=True)
     id_token = serializers.CharField(required=False, allow_blank=True)
     code = serializers.CharField(required=False, allow_blank=True)
     code_verifier = serializers.CharField(required=False, allow_blank=True)
+    def validate_provider(self, value):
+        if value not in PROVIDER_NAMES:
+            raise serializers.ValidationError('Unsupported provider')
+        return value
@@ -6,16 +6,28 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.exceptions import InvalidToken
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.conf import settings
+from django.http import JsonResponse
 from .models import SocialAccount, EmailVerificationToken
 from .serializers import RegisterSerializer, LoginSerializer, SocialAuthSerializer
 from .emails import send_verification_email
 from .providers import PROVIDERS
-import requests
+from .authentication import ProviderJWTAuthentication
+import httpx
+import re
 
 User = get_user_model()
 
+# Fixed-shape success bodies skip DRF content negotiation and rendering
+_COMPACT_JSON = {'separators': (',', ':')}
+
+# Whitespace stripped from provider display names when deriving a username
+_USERNAME_TRANS = str.maketrans('', '', ' \t\r\n')
+
+def _user_payload(user):
+    return {'id': user.id, 'username': user.username, 'email': user.email, 'email_verified': user.email_verified}
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
     def post(self, request):
@@ -30,12 +42,11 @@ class VerifyEmailView(APIView):
     permission_classes = [AllowAny]
     def get(self, request):
         token = request.query_params.get('token')
-        try:
-            t = EmailVerificationToken.objects.get(token=token, is_used=False)
-        except EmailVerificationToken.DoesNotExist:
+        # Guarded UPDATE claims the token atomically, so it can only be used once
+        updated = EmailVerificationToken.objects.filter(token=token, is_used=False).update(is_used=True)
+        if not updated:
             return Response({"detail": "Invalid token"}, status=400)
-        t.is_used = True; t.save()
-        user = t.user; user.email_verified = True; user.save(update_fields=['email_verified'])
+        User.objects.filter(email_tokens__token=token).update(email_verified=True)
         return Response({"message": "Email verified"})
 
 class LoginView(APIView):
@@ -45,15 +56,13 @@ class LoginView(APIView):
         ser.is_valid(raise_exception=True)
         user = ser.validated_data['user']
         refresh = RefreshToken.for_user(user)
-        return Response({'access': str(refresh.access_token), 'refresh': str(refresh), 'user': {'id': user.id, 'username': user.username, 'email': user.email, 'email_verified': user.email_verified}})
+        return JsonResponse({'access': str(refresh.access_token), 'refresh': str(refresh), 'user': _user_payload(user)}, json_dumps_params=_COMPACT_JSON)
 
 class SocialAuthView(APIView):
     permission_classes = [AllowAny]
 
     @transaction.atomic
     def post(self, request, provider):
-        if provider not in PROVIDERS:
-            return Response({"detail": "Unsupported provider"}, status=400)
         serializer = SocialAuthSerializer(data={**request.data, 'provider': provider})
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
@@ -67,65 +76,9 @@ class SocialAuthView(APIView):
         # If code provided, exchange it
         if code and not access_token:
             try:
-                if provider == 'google':
-                    token_url = 'https://oauth2.googleapis.com/token'
-                    payload = {
-                        'code': code, 
-                        'client_id': settings.GOOGLE_CLIENT_ID, 
-                        'client_secret': settings.GOOGLE_CLIENT_SECRET, 
-                        'redirect_uri': settings.OAUTH_REDIRECT_URI, 
-                        'grant_type': 'authorization_code',
-                    }
-                    if code_verifier: payload['code_verifier'] = code_verifier
-                    r = requests.post(
-                            token_url, 
-                            data = payload,
-                        )
-                    r.raise_for_status(); tok = r.json(); access_token = tok.get('access_token'); id_token = tok.get('id_token')
-
-                elif provider == 'github':
-                    token_url = 'https://github.com/login/oauth/access_token'
-                    r = requests.post(
-                            token_url, 
-                            data = {
-                                'client_id': settings.GITHUB_CLIENT_ID, 
-                                'client_secret': settings.GITHUB_CLIENT_SECRET, 
-                                'code': code, 
-                                'redirect_uri': settings.OAUTH_REDIRECT_URI,
-                            }, 
-                            headers = {
-                                'Accept': 'application/json',
-                            }
-                        )
-                    r.raise_for_status(); access_token = r.json().get('access_token')
-
-                elif provider == 'facebook':
-                    token_url = 'https://graph.facebook.com/v17.0/oauth/access_token'
-                    r = requests.get(
-                            token_url, 
-                            params = {
-                                'client_id': settings.FACEBOOK_CLIENT_ID, 
-                                'client_secret': settings.FACEBOOK_CLIENT_SECRET, 
-                                'code': code, 
-                                'redirect_uri': settings.OAUTH_REDIRECT_URI,
-                            }
-                        )
-                    r.raise_for_status(); access_token = r.json().get('access_token')
-
-                elif provider == 'linkedin':
-                    token_url = 'https://www.linkedin.com/oauth/v2/accessToken'
-                    payload = {
-                        'grant_type': 'authorization_code',
-                        'code': code,
-                        'client_id': settings.LINKEDIN_CLIENT_ID,
-                        'client_secret': settings.LINKEDIN_CLIENT_SECRET,
-                        'redirect_uri': settings.OAUTH_REDIRECT_URI,
-                    }
-                    if code_verifier: payload['code_verifier'] = code_verifier
-                    r = requests.post(token_url, data=payload)
-                    r.raise_for_status(); access_token = r.json().get('access_token')
-
-            except requests.RequestException as e:
+                access_token, id_token = Provider.exchange_code(code, code_verifier)
+
+            except (httpx.HTTPError, ValueError) as e:
                 return Response({
                     'detail': 'Code exchange failed', 
                     'error': str(e)
@@ -133,13 +86,7 @@ class SocialAuthView(APIView):
 
         # If we have id_token or access_token, fetch user
         try:
-            if provider == 'google':
-                if id_token:
-                    uid, profile = Provider.fetch_user(id_token=id_token)
-                else:
-                    uid, profile = Provider.fetch_user(access_token=access_token)
-            else:
-                uid, profile = Provider.fetch_user(access_token)
+            uid, profile = Provider.fetch_user(access_token=access_token, id_token=id_token)
 
         except Exception as e:
             return Response({
@@ -154,43 +101,57 @@ class SocialAuthView(APIView):
             social = SocialAccount.objects.select_related('user').get(provider=provider, provider_uid=uid)
             user = social.user
 
+            if social.extra_data != profile:
+                social.extra_data = profile; social.save(update_fields=['extra_data'])
+
         except SocialAccount.DoesNotExist:
-            user = None
-            if email:
-                user = User.objects.filter(email=email).first()
-            if not user:
-                base_username = (name or email or f"{provider}_{uid}").split('@')[0].replace(' ', '').lower() or f"user_{str(uid)[:6]}"
-                username = base_username; i = 1
-
-                while User.objects.filter(username=username).exists():
-                    i += 1; username = f"{base_username}{i}"
-
-                user = User.objects.create(
-                            username = username, 
-                            email = email or f"{provider}_{uid}@example.com", 
-                            email_verified = bool(email)
+            # A unique-constraint race (same account, username or email) rolls back
+            # the savepoint; the second pass re-matches the email and re-reads
+            # the taken usernames before creating again
+            for _ in range(2):
+                try:
+                    with transaction.atomic():
+                        user = None
+                        if email:
+                            user = User.objects.filter(email=email).only('id', 'username', 'email', 'email_verified', 'is_active', 'password').first()
+                        if not user:
+                            base = (name or email or f"{provider}_{uid}").partition('@')[0]
+                            base_username = base.translate(_USERNAME_TRANS).lower() or f"user_{str(uid)[:6]}"
+                            taken = set(User.objects.filter(username__startswith=base_username, username__regex=rf'^{re.escape(base_username)}\d*$').values_list('username', flat=True))
+                            username = base_username; i = 1
+
+                            while username in taken:
+                                i += 1; username = f"{base_username}{i}"
+
+                            user = User.objects.create(
+                                        username = username, 
+                                        email = email or f"{provider}_{uid}@example.com", 
+                                        email_verified = bool(email)
+                                    )
+                        SocialAccount.objects.create( 
+                            user=user, 
+                            provider=provider, 
+                            provider_uid=uid, 
+                            extra_data=profile
                         )
-            SocialAccount.objects.create( 
-                user=user, 
-                provider=provider, 
-                provider_uid=uid, 
-                extra_data=profile
-            )
+                    break
+
+                except IntegrityError:
+                    social = SocialAccount.objects.select_related('user').filter(provider=provider, provider_uid=uid).first()
+                    if social:
+                        user = social.user; break
+            else:
+                return Response({"detail": "Account is being created by another request, please retry"}, status=409)
 
         refresh = RefreshToken.for_user(user)
         access_token = str(refresh.access_token)
         refresh_token = str(refresh)
 
-        response =  Response({
+        response =  JsonResponse({
             'access': access_token, 
             'refresh': refresh_token, 
-            'user': {
-                'id': user.id, 
-                'username': user.username, 
-                'email': user.email, 
-                'email_verified': user.email_verified
-            }
-        })
+            'user': _user_payload(user),
+        }, json_dumps_params=_COMPACT_JSON)
 
         # Store refresh token in HttpOnly cookie
         response.set_cookie(
@@ -204,16 +165,14 @@ class SocialAuthView(APIView):
         return response
 
 class MeView(APIView):
+    authentication_classes = [ProviderJWTAuthentication]
     permission_classes = [IsAuthenticated]
     def get(self, request):
         u = request.user
-        return Response({
-            'id': u.id, 
-            'username': u.username, 
-            'email': u.email, 
-            'email_verified': u.email_verified, 
-            'providers': list(u.social_accounts.values_list('provider', flat=True))
-        })
+        return JsonResponse({
+            **_user_payload(u), 
+            'providers': u.providers
+        }, json_dumps_params=_COMPACT_JSON)
 
 class LogoutView(APIView):
     def post(self, request):
@@ -230,6 +189,6 @@ class CookieTokenRefreshView(APIView):
         try:
             refresh = RefreshToken(refresh_token)
             access_token = str(refresh.access_token)
-            return Response({"access": access_token})
+            return JsonResponse({"access": access_token}, json_dumps_params=_COMPACT_JSON)
         except Exception:
             raise InvalidToken("Invalid refresh token")
\ No newline at end of file
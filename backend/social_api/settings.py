@@ -3,10 +3,15 @@ from pathlib import Path
 from datetime import timedelta
 import yaml
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 with open(os.path.join(BASE_DIR,'config.yaml'), 'r') as f:
-    CONFIG = yaml.load(f, Loader = yaml.SafeLoader)
+    CONFIG = yaml.load(f, Loader = _Loader)
 
 SECRET_KEY = CONFIG['SECRET_KEY']
 DEBUG = CONFIG['DEBUG']
@@ -71,7 +76,11 @@ DATABASES = {
         'PORT': CONFIG['PGPORT'],
         'OPTIONS': {
             'sslmode': CONFIG['PGSSLMODE'],
+            'keepalives': 1,
+            'keepalives_idle': 30,
         },
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
         'DISABLE_SERVER_SIDE_CURSORS': True,
     }
 }
@@ -85,6 +94,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'accounts.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 SIMPLE_JWT = {